@@ -1,4 +1,5 @@
 import bittensor as bt
+import logging
 import os
 from pathlib import Path
 
@@ -38,3 +39,13 @@ def configure_logging() -> str:
         f"✅ Logging configured: level={level_name}, record_log={record_log}, dir={log_dir_path}"
     )
     return level_name
+
+
+def debug_enabled() -> bool:
+    """
+    True when debug (or trace) messages are emitted.
+
+    bt.logging.debug takes (msg, prefix, suffix, ...) so it can't defer %-formatting;
+    guard f-string messages in per-block loops with this instead.
+    """
+    return bt.logging.get_level() <= logging.DEBUG
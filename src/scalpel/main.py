@@ -21,7 +21,8 @@ async def main():
         archive_endpoints=(
             ["wss://archive.chain.opentensor.ai:443"] if not TEST_MODE else None
         ),
-        websocket_shutdown_timer=20,
+        # Long-running bot: keep the one websocket open instead of idling it out and reconnecting
+        websocket_shutdown_timer=None,
     ) as subtensor:
         scalp_buyer = ScalpRunner(
             subtensor=subtensor,
@@ -31,5 +32,10 @@ async def main():
 
 
 if __name__ == "__main__":
-
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        # libuv-based loop: cheaper task scheduling for the gather/wait_for-heavy block loop
+        uvloop.run(main())
@@ -17,35 +17,8 @@ class StakeRemovedEvent:
     def from_substrate_event(
         cls, raw: Mapping[str, Any]
     ) -> Optional["StakeRemovedEvent"]:
-        event_data = raw.get("event")
-        if not isinstance(event_data, Mapping):
-            return None
-
-        if event_data.get("event_id") != "StakeRemoved":
-            return None
-
-        attributes = event_data.get("attributes")
-        if not isinstance(attributes, Sequence) or len(attributes) != 6:
-            return None
-
-        (
-            coldkey_ss58,
-            validator_ss58,
-            tao_recived_rao,
-            alpha_unstaked_rao,
-            netuid,
-            paid_fee_rao,
-        ) = attributes
-
-        # Ensure numeric fields are ints even if substrate returns strings or other numeric types
-        return cls(
-            coldkey_ss58=str(coldkey_ss58),
-            validator_ss58=str(validator_ss58),
-            tao_recived_rao=int(tao_recived_rao),
-            alpha_unstaked_rao=int(alpha_unstaked_rao),
-            netuid=int(netuid),
-            paid_fee_rao=int(paid_fee_rao),
-        )
+        event = parse_stake_event(raw)
+        return event if isinstance(event, cls) else None
 
 
 @dataclass(frozen=True, slots=True)
@@ -61,38 +34,80 @@ class StakeAddedEvent:
     def from_substrate_event(
         cls, raw: Mapping[str, Any]
     ) -> Optional["StakeAddedEvent"]:
-        event_data = raw.get("event")
-        if not isinstance(event_data, Mapping):
-            return None
-
-        if event_data.get("event_id") != "StakeAdded":
-            return None
-
-        attributes = event_data.get("attributes")
-        if not isinstance(attributes, Sequence) or len(attributes) != 6:
-            return None
-
-        (
-            coldkey_ss58,
-            validator_ss58,
-            staking_amount_rao,
-            alpha_received_rao,
-            netuid,
-            paid_fee_rao,
-        ) = attributes
-
-        # Ensure numeric fields are ints even if substrate returns strings or other numeric types
-        return cls(
-            coldkey_ss58=str(coldkey_ss58),
-            validator_ss58=str(validator_ss58),
-            staking_amount_rao=int(staking_amount_rao),
-            alpha_received_rao=int(alpha_received_rao),
-            netuid=int(netuid),
-            paid_fee_rao=int(paid_fee_rao),
-        )
-
-
-@dataclass
+        event = parse_stake_event(raw)
+        return event if isinstance(event, cls) else None
+
+
+# Both events share the same attribute layout:
+# (coldkey, validator, tao/alpha amount, alpha/tao amount, netuid, fee)
+_EVENT_CLASSES: dict[str, type[StakeAddedEvent] | type[StakeRemovedEvent]] = {
+    "StakeAdded": StakeAddedEvent,
+    "StakeRemoved": StakeRemovedEvent,
+}
+
+
+def parse_stake_event(
+    raw: Mapping[str, Any],
+) -> StakeAddedEvent | StakeRemovedEvent | None:
+    """Parse a substrate event into StakeAddedEvent/StakeRemovedEvent, None for anything else."""
+    event_data = raw.get("event")
+    if not isinstance(event_data, Mapping):
+        return None
+
+    cls = _EVENT_CLASSES.get(event_data.get("event_id"))
+    if cls is None:
+        return None
+
+    attributes = event_data.get("attributes")
+    if not isinstance(attributes, Sequence) or len(attributes) != 6:
+        return None
+
+    coldkey_ss58, validator_ss58, amount_in, amount_out, netuid, paid_fee_rao = (
+        attributes
+    )
+
+    # Ensure numeric fields are ints even if substrate returns strings or other numeric types
+    return cls(
+        str(coldkey_ss58),
+        str(validator_ss58),
+        int(amount_in),
+        int(amount_out),
+        int(netuid),
+        int(paid_fee_rao),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class CachedReceipt:
+    """Extrinsic receipt with the fields we use resolved once, right after submission."""
+
+    # Chain outcome; None when it couldn't be read (timeout, node error), in which
+    # case the extrinsic may still have landed and must not be booked as failed
+    ok: Optional[bool]
+    error_message: Optional[dict | str]
+    block_hash: Optional[str]
+    extrinsic_hash: Optional[str]
+    block_number: Optional[int]
+    # Fee the chain actually charged for the extrinsic, None when it couldn't be read
+    fee_rao: Optional[int]
+    # Our own stake events from this extrinsic, keyed by (event type, netuid)
+    stake_events: Mapping[
+        tuple[type, int], Sequence[StakeAddedEvent | StakeRemovedEvent]
+    ]
+
+
+@dataclass(slots=True)
+class PendingReceipt:
+    """Included extrinsic whose outcome is still unknown, with the orders it carried."""
+
+    receipt: CachedReceipt
+    stake_netuids: tuple[int, ...]
+    unstake_netuids: tuple[int, ...]
+    # Re-reads that came back unknown again
+    attempts: int = 0
+
+
+@dataclass(slots=True)
 class Position:
     netuid: int
     total_alpha_rao: int = 0
@@ -120,7 +135,7 @@ class Position:
         return bt.Balance.from_rao(self.realized_profit_rao, netuid=0)
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     id: int
     netuid: int
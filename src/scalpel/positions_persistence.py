@@ -1,42 +1,95 @@
+import asyncio
 import bittensor as bt
 import json
+import os
+from pathlib import Path
 
 from scalpel.models import Position
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 if TYPE_CHECKING:
     from scalpel.scalp_runner import ScalpRunner
 
+# Rewrite the full snapshot and truncate the log after this many appended entries
+COMPACT_AFTER_LOG_ENTRIES = 1000
+
+# Built once: json.dumps() with custom options constructs a new encoder on every call
+_LOG_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_SNAPSHOT_ENCODER = json.JSONEncoder(indent=2)
+
+
+def positions_log_path(positions_path: Path) -> Path:
+    """Append-only NDJSON log of position updates written next to the snapshot."""
+    return positions_path.with_suffix(positions_path.suffix + ".log")
+
+
+def _position_from_dict(netuid: int, pos_dict: dict) -> Position:
+    return Position(
+        netuid=netuid,
+        total_alpha_rao=int(pos_dict.get("total_alpha_rao", 0)),
+        total_tao_spent_rao=int(pos_dict.get("total_tao_spent_rao", 0)),
+        realized_profit_rao=int(pos_dict.get("realized_profit_rao", 0)),
+    )
+
+
+def _position_to_dict(pos: Position) -> dict:
+    return {
+        "netuid": pos.netuid,
+        "total_alpha_rao": pos.total_alpha_rao,
+        "total_tao_spent_rao": pos.total_tao_spent_rao,
+        "realized_profit_rao": pos.realized_profit_rao,
+    }
+
 
 async def load_positions(self: "ScalpRunner") -> None:
-    """Load current positions from JSON if available."""
-    if not self.positions_path.exists():
+    """Load positions from the JSON snapshot, then replay the update log on top of it."""
+    log_path = positions_log_path(self.positions_path)
+    if not self.positions_path.exists() and not log_path.exists():
         bt.logging.info(
             f"No positions file found: {self.positions_path}. Starting fresh."
         )
         return
 
     try:
-        raw = json.loads(self.positions_path.read_text(encoding="utf-8"))
-        positions_obj = raw.get("positions", {})
-        if not isinstance(positions_obj, dict):
-            bt.logging.warning(
-                "Invalid positions.json format (positions is not a dict). Starting fresh."
-            )
-            return
-
         loaded: dict[int, Position] = {}
-        for netuid_str, pos_dict in positions_obj.items():
+        if self.positions_path.exists():
+            data = await asyncio.to_thread(self.positions_path.read_bytes)
             try:
-                netuid = int(netuid_str)
-                loaded[netuid] = Position(
-                    netuid=netuid,
-                    total_alpha_rao=int(pos_dict.get("total_alpha_rao", 0)),
-                    total_tao_spent_rao=int(pos_dict.get("total_tao_spent_rao", 0)),
-                    realized_profit_rao=int(pos_dict.get("realized_profit_rao", 0)),
-                )
+                raw = json.loads(data)
+                positions_obj = raw.get("positions", {})
             except Exception:
-                continue
+                positions_obj = None
+            if not isinstance(positions_obj, dict):
+                # The log still holds every update since the last compaction, replay it
+                bt.logging.warning(
+                    "Invalid positions.json format (positions is not a dict). "
+                    "Replaying the update log over empty positions."
+                )
+                positions_obj = {}
+
+            for netuid_str, pos_dict in positions_obj.items():
+                try:
+                    netuid = int(netuid_str)
+                    loaded[netuid] = _position_from_dict(netuid, pos_dict)
+                except Exception:
+                    continue
+
+        if log_path.exists():
+            log_data = await asyncio.to_thread(log_path.read_bytes)
+            # Each line is a full position state, so the last line per netuid wins
+            for line in log_data.splitlines():
+                try:
+                    pos_dict = json.loads(line)
+                    netuid = int(pos_dict["netuid"])
+                    loaded[netuid] = _position_from_dict(netuid, pos_dict)
+                except Exception:
+                    # Torn last line after a crash mid-append
+                    continue
+                self._positions_log_entries += 1
+            if log_data and not log_data.endswith(b"\n"):
+                # Drop the torn tail so the next append starts on a fresh line
+                torn_free = log_data[: log_data.rfind(b"\n") + 1]
+                await asyncio.to_thread(log_path.write_bytes, torn_free)
 
         self.positions = loaded
         bt.logging.info(
@@ -46,20 +99,58 @@ async def load_positions(self: "ScalpRunner") -> None:
         bt.logging.error(f"Failed to load positions: {e}")
 
 
-async def save_positions(self: "ScalpRunner") -> None:
-    """Atomically save current positions snapshot to JSON."""
+async def save_positions(self: "ScalpRunner", netuids: Iterable[int]) -> None:
+    """Append the given positions to the update log, compacting into the snapshot when it grows."""
     async with self._persist_lock:
-        payload = {
-            "positions": {
-                str(netuid): {
-                    "netuid": pos.netuid,
-                    "total_alpha_rao": pos.total_alpha_rao,
-                    "total_tao_spent_rao": pos.total_tao_spent_rao,
-                    "realized_profit_rao": pos.realized_profit_rao,
-                }
-                for netuid, pos in self.positions.items()
-            },
-        }
-        tmp_path = self.positions_path.with_suffix(self.positions_path.suffix + ".tmp")
-        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-        tmp_path.replace(self.positions_path)
+        lines = [
+            _LOG_ENCODER.encode(_position_to_dict(self.positions[netuid])) + "\n"
+            for netuid in netuids
+            if netuid in self.positions
+        ]
+        if not lines:
+            return
+        log_path = positions_log_path(self.positions_path)
+        # File I/O runs in a worker thread so a slow disk doesn't stall the block loop
+        await asyncio.to_thread(_append, log_path, "".join(lines).encode("utf-8"))
+        self._positions_log_entries += len(lines)
+
+        if self._positions_log_entries >= COMPACT_AFTER_LOG_ENTRIES:
+            payload = {
+                "positions": {
+                    str(netuid): _position_to_dict(pos)
+                    for netuid, pos in self.positions.items()
+                },
+            }
+            data = _SNAPSHOT_ENCODER.encode(payload).encode("utf-8")
+            await asyncio.to_thread(_compact, self.positions_path, log_path, data)
+            self._positions_log_entries = 0
+
+
+def _append(path: Path, data: bytes) -> None:
+    with path.open("ab") as f:
+        f.write(data)
+
+
+def _compact(path: Path, log_path: Path, data: bytes) -> None:
+    # Snapshot first: if we crash before truncating, replaying the log is idempotent.
+    # The snapshot must be durable (file and rename) before the log is emptied.
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+    log_path.write_bytes(b"")
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Persists the rename; directories can't be opened for fsync on Windows
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
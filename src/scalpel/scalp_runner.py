@@ -3,16 +3,40 @@ from bittensor.core.extrinsics.pallets.base import Call
 from async_substrate_interface.async_substrate import AsyncExtrinsicReceipt
 import bittensor as bt
 import asyncio
+from collections import defaultdict
+from dataclasses import replace
 from pathlib import Path
+from typing import Sequence
 from bittensor.core.chain_data import DynamicInfo
 
-from scalpel.subnet_config import get_subnet_configs, SubnetConfig
-from scalpel.models import StakeAddedEvent, StakeRemovedEvent, Position
+from scalpel.logger import debug_enabled
+from scalpel.subnet_config import get_subnet_configs, SubnetConfig, SubnetRuntime
+from scalpel.models import (
+    CachedReceipt,
+    PendingReceipt,
+    StakeAddedEvent,
+    StakeRemovedEvent,
+    Position,
+    parse_stake_event,
+)
 from scalpel.positions_persistence import load_positions, save_positions
-from scalpel.sell_planner import build_sell_plan
+from scalpel.sell_planner import PPM_DEN, SellPlan, build_sell_plan
 
 EXTRINSIC_FEE_TAO_ADD_STAKE = bt.Balance.from_tao(0.000136963)
 EXTRINSIC_FEE_TAO_REMOVE_STAKE = bt.Balance.from_tao(0.000135688)
+# Plain ints for the per-receipt accounting, no Balance attribute access in the hot path
+EXTRINSIC_FEE_RAO_ADD_STAKE: int = int(EXTRINSIC_FEE_TAO_ADD_STAKE.rao)
+EXTRINSIC_FEE_RAO_REMOVE_STAKE: int = int(EXTRINSIC_FEE_TAO_REMOVE_STAKE.rao)
+SIGN_AND_SEND_ATTEMPTS = 3
+RECEIPT_TIMEOUT_SECONDS = 20.0
+# Blocks an unreadable receipt is re-read on before it is booked as failed
+PENDING_RECEIPT_ATTEMPTS = 5
+# Headers waiting for the block worker; when full the oldest is dropped, never the subscription
+BLOCK_QUEUE_SIZE = 4
+# Below this free balance (0.01 TAO) no buys are attempted
+MIN_BALANCE_RAO = 10_000_000
+# Free balance is tracked locally from our own events and re-read from chain this often
+BALANCE_REFRESH_BLOCKS = 10
 
 
 class ScalpRunner:
@@ -23,45 +47,87 @@ class ScalpRunner:
         positions_path: str = "positions.json",
     ):
         self.subtensor = subtensor
+        # Call builder for the add/remove stake limit calls, built once
+        self._pallet = SubtensorModule(self.subtensor)
         self.prices: dict[int, bt.Balance]
         self.dynamics: dict[int, bt.DynamicInfo]
-        self.subnets_config: list[SubnetConfig]
+        self.subnets_config: tuple[SubnetConfig, ...]
+        # netuid -> prepared buy/sell calls
+        self.subnet_runtime: dict[int, SubnetRuntime] = {}
         self.current_block: int
+        self._era: dict[str, int]
         self.wallet = bt.Wallet(wallet_name)
         bt.logging.info(
             f"Using wallet {self.wallet.coldkey.ss58_address}: {self.wallet}"
         )
         self.positions: dict[int, Position] = {}
         self._persist_lock = asyncio.Lock()
+        # netuids whose position changed since the last flush to the positions log
+        self._dirty_netuids: set[int] = set()
+        self._positions_log_entries = 0
+        self._balance_rao: int | None = None
+        self._balance_block = 0
+        # Included extrinsics whose outcome couldn't be read yet, re-read every block
+        self._pending_receipts: list[PendingReceipt] = []
+        self._block_queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=BLOCK_QUEUE_SIZE)
         self.positions_path = Path(positions_path)
 
     async def run(self):
-        await load_positions(self)
-        current_block = await self.subtensor.substrate.get_block()
+        _, current_block = await asyncio.gather(
+            load_positions(self), self.subtensor.substrate.get_block()
+        )
         current_block_hash = current_block.get("header", {}).get("hash")
         self.subnets_config = get_subnet_configs()
         await self.create_calls_buy()  # this calls will always remain the same
-        await self.subtensor.substrate.get_block_handler(
-            current_block_hash,
-            header_only=True,
-            subscription_handler=self.handler,
-        )
+        worker = asyncio.create_task(self.block_worker())
+        try:
+            await self.subtensor.substrate.get_block_handler(
+                current_block_hash,
+                header_only=True,
+                subscription_handler=self.handler,
+            )
+        finally:
+            worker.cancel()
 
     async def handler(self, block_data: dict):
+        # Only hand the header over, so a slow block never stalls the subscription
+        if self._block_queue.full():
+            # Stale headers are worthless to trade on, keep the newest ones
+            dropped = self._block_queue.get_nowait()
+            bt.logging.warning(
+                f"Block worker behind, dropping block {dropped['header']['number']}"
+            )
+        self._block_queue.put_nowait(block_data)
+        return None
+
+    async def block_worker(self):
+        while True:
+            block_data = await self._block_queue.get()
+            try:
+                await self.process_block(block_data)
+            except Exception as e:
+                bt.logging.error(
+                    f"Error processing block {block_data['header']['number']}: {e}"
+                )
+
+    async def process_block(self, block_data: dict):
         self.current_block = block_data["header"]["number"]
+        # Mortal era for this block's extrinsic: anchored 2 blocks back, valid for 4
+        self._era = {"period": 4, "current": self.current_block - 2}
         bt.logging.info(f"Current block: [blue]{self.current_block}[/blue]")
-        await self.refresh_prices()
+        if self._pending_receipts:
+            # Before the balance refresh and the stake sync, which must see these booked
+            await self.resolve_pending_receipts()
+        # Both only read chain state, the buy/sell checks below need them done
+        await asyncio.gather(self.refresh_prices(), self.refresh_balance())
         subnets_to_stake, subnets_to_unstake = await asyncio.gather(
             *[
                 self.get_subnets_to_stake(),
                 self.get_subnets_to_unstake(),
             ]
         )
-        responses_for_stake, responses_for_unstake = await asyncio.gather(
-            *[
-                self.process_subnets(subnets_to_stake, call_is_buy=True),
-                self.process_subnets(subnets_to_unstake, call_is_buy=False),
-            ]
+        responses_for_stake, responses_for_unstake = await self.process_subnets(
+            subnets_to_stake, subnets_to_unstake
         )
         await asyncio.gather(
             *[
@@ -73,49 +139,32 @@ class ScalpRunner:
                 for response in responses_for_unstake
             ],
         )
+        if self._dirty_netuids:
+            # One append per block, covering every position that changed during it
+            dirty_netuids, self._dirty_netuids = self._dirty_netuids, set()
+            await save_positions(self, dirty_netuids)
         self.log_unrealized_pnl()
-        return None
 
     async def process_response_unstake(
-        self, response: tuple[int, AsyncExtrinsicReceipt] | tuple[None, None]
+        self, response: tuple[int, CachedReceipt | None]
     ) -> None:
         response_netuid, receipt = response
         if response_netuid is None or receipt is None:
             return
 
-        pos = self.positions.get(response_netuid)
-        if pos is None:
-            # Nothing to sell-account against; still may pay fee, but this likely means logic error.
-            pos = Position(response_netuid)
-            self.positions[response_netuid] = pos
-
-        # Account flat (weight-based) extrinsic fee once per sell attempt, regardless of success.
-        # We store it in realized PnL as a trading cost.
-        pos.realized_profit_rao -= EXTRINSIC_FEE_TAO_REMOVE_STAKE.rao
+        # A missing position means nothing to sell-account against, likely a logic error.
+        # The extrinsic fee share was already booked by _account_extrinsic_fee.
+        pos = self.positions.setdefault(response_netuid, Position(response_netuid))
 
-        ok = await receipt.is_success
-        if not ok:
+        if not receipt.ok:
             bt.logging.warning(
-                f"Unstake extrinsic failed; fee accounted. Position: {pos}"
+                f"Unstake extrinsic failed; fee share accounted. Position: {pos}"
             )
-            await save_positions(self)
             return
 
-        events = await self.subtensor.substrate.get_events(receipt.block_hash)
-
-        any_event_applied = False
-
-        for event in events:
-            removed = StakeRemovedEvent.from_substrate_event(event)
-            if removed is None:
-                continue
-
-            # Filter to our wallet + correct subnet
-            if removed.coldkey_ss58 != self.wallet.coldkey.ss58_address:
-                continue
-            if removed.netuid != response_netuid:
-                continue
-
+        log_debug = debug_enabled()
+        removed_events = receipt.stake_events.get((StakeRemovedEvent, response_netuid), ())
+        for removed in removed_events:
             if pos.total_alpha_rao <= 0:
                 bt.logging.warning(
                     f"Received StakeRemoved but position has no alpha. Event: {removed}"
@@ -138,59 +187,71 @@ class ScalpRunner:
             # Realized PnL from this fill (flat fee already accounted above)
             realized_pnl_rao = proceeds_rao - cost_basis_sold_rao
 
-            bt.logging.debug(f"Positions before SELL: {pos}")
+            if log_debug:
+                bt.logging.debug(f"Positions before SELL: {pos}")
             pos.realized_profit_rao += realized_pnl_rao
             pos.total_alpha_rao -= sell_qty_rao
             pos.total_tao_spent_rao -= cost_basis_sold_rao
+            self._adjust_balance(proceeds_rao)
 
             # Clean up rounding leftovers when fully closed
             # This is also needed since when we sell we substract 1 from postions
             if pos.total_alpha_rao <= 1:
                 pos.total_tao_spent_rao = 0
 
-            bt.logging.debug(f"Applied StakeRemoved: {removed}")
-            bt.logging.debug(f"Positions after SELL: {pos}")
-
-            any_event_applied = True
-
-        if any_event_applied:
-            await save_positions(self)
-        else:
-            # Still persist fee change
-            await save_positions(self)
+            if log_debug:
+                bt.logging.debug(f"Applied StakeRemoved: {removed}")
+                bt.logging.debug(f"Positions after SELL: {pos}")
 
     async def get_subnets_to_unstake(self) -> list[SubnetConfig]:
-        subnets: list[SubnetConfig] = []
+        to_sell: list[tuple[SubnetConfig, SellPlan]] = []
+        log_debug = debug_enabled()
+
+        pending_netuids = self._pending_netuids()
 
+        held: list[tuple[SubnetConfig, Position]] = []
         for cfg in self.subnets_config:
             pos = self.positions.get(cfg.netuid)
             if pos is None or pos.total_alpha_rao <= 0:
                 # bt.logging.debug(f"Positions netuid: {cfg.netuid} is None or 0")
                 continue
+            if cfg.netuid in pending_netuids:
+                # An unbooked fill would look like accrued rewards to the stake sync below
+                continue
+            held.append((cfg, pos))
 
-            stake_from_chain: bt.Balance = await self.subtensor.get_stake(
-                coldkey_ss58=self.wallet.coldkey.ss58_address,
-                hotkey_ss58=cfg.validator_hotkey,
-                netuid=cfg.netuid,
-            )
+        # Query all on-chain stakes at once, the websocket multiplexes the requests
+        stakes_from_chain: list[bt.Balance] = await asyncio.gather(
+            *[
+                self.subtensor.get_stake(
+                    coldkey_ss58=self.wallet.coldkey.ss58_address,
+                    hotkey_ss58=cfg.validator_hotkey,
+                    netuid=cfg.netuid,
+                )
+                for cfg, _ in held
+            ]
+        )
+
+        for (cfg, pos), stake_from_chain in zip(held, stakes_from_chain):
             onchain_alpha_rao = int(stake_from_chain.rao)
             # Sync local position to on-chain stake (source of truth)
             if onchain_alpha_rao > pos.total_alpha_rao:
                 # Rewards accrued
                 pos.total_alpha_rao = onchain_alpha_rao
-                await save_positions(self)
+                self._dirty_netuids.add(cfg.netuid)
             elif onchain_alpha_rao < pos.total_alpha_rao:
                 # Local state is ahead -> clamp to on-chain to avoid oversell
                 pos.total_alpha_rao = onchain_alpha_rao
-                await save_positions(self)
+                self._dirty_netuids.add(cfg.netuid)
 
             dyn = self.dynamics.get(cfg.netuid)
             if dyn is None:
-                bt.logging.debug(f"Dynamic netuid: {cfg.netuid} is None")
+                if log_debug:
+                    bt.logging.debug(f"Dynamic netuid: {cfg.netuid} is None")
                 continue
 
             # Compute desired sell amount based on sell_pct and min_sell_alpha
-            desired_sell_rao = int(pos.total_alpha_rao * cfg.sell_pct)
+            desired_sell_rao = pos.total_alpha_rao * cfg.sell_pct_ppm // PPM_DEN
             if desired_sell_rao < cfg.min_sell_alpha_rao:
                 desired_sell_rao = min(cfg.min_sell_alpha_rao, pos.total_alpha_rao)
 
@@ -199,25 +260,33 @@ class ScalpRunner:
                 dynamic=dyn,
                 position_total_alpha_rao=pos.total_alpha_rao,
                 position_total_tao_spent_rao=pos.total_tao_spent_rao,
-                pct_profit=cfg.pct_profit,
-                slippage_sell_pct=cfg.slippage_sell_pct,
-                flat_fee_sell_rao=EXTRINSIC_FEE_TAO_REMOVE_STAKE.rao,
+                pct_profit_ppm=cfg.pct_profit_ppm,
+                slippage_sell_ppm=cfg.slippage_sell_ppm,
+                flat_fee_sell_rao=EXTRINSIC_FEE_RAO_REMOVE_STAKE,
                 min_gross_fill_rao=0,
                 max_sell_alpha_rao=desired_sell_rao,
             )
             if plan is None:
-                bt.logging.debug(f"Plan netuid: {cfg.netuid} is None")
+                if log_debug:
+                    bt.logging.debug(f"Plan netuid: {cfg.netuid} is None")
                 continue
 
             spot_price = self.prices.get(cfg.netuid)
             if spot_price is None:
-                bt.logging.debug(f"spot_price netuid: {cfg.netuid} is None")
+                if log_debug:
+                    bt.logging.debug(f"spot_price netuid: {cfg.netuid} is None")
                 continue
 
-            if spot_price.tao >= plan.activation_price.tao:
-                cfg.call_sell = await SubtensorModule(
-                    self.subtensor
-                ).remove_stake_limit(
+            if spot_price.rao >= plan.activation_price.rao:
+                to_sell.append((cfg, plan))
+            elif log_debug:
+                bt.logging.debug(
+                    f"Postions netuid: {pos.netuid} activation_price: {plan.activation_price} > spot_price: {spot_price}"
+                )
+
+        calls = await asyncio.gather(
+            *[
+                self._pallet.remove_stake_limit(
                     hotkey=cfg.validator_hotkey,
                     netuid=cfg.netuid,
                     amount_unstaked=plan.amount_alpha_to_sell_rao
@@ -225,154 +294,359 @@ class ScalpRunner:
                     limit_price=plan.limit_price.rao,
                     allow_partial=True,
                 )
-                subnets.append(cfg)
-            else:
-                bt.logging.debug(
-                    f"Postions netuid: {pos.netuid} activation_price: {plan.activation_price} > spot_price: {spot_price}"
-                )
-        return subnets
+                for cfg, plan in to_sell
+            ]
+        )
+        for (cfg, _), call in zip(to_sell, calls):
+            self.subnet_runtime[cfg.netuid].call_sell = call
+        return [cfg for cfg, _ in to_sell]
 
     async def process_subnets(
-        self, subnets: list[SubnetConfig], call_is_buy: bool
-    ) -> list[tuple[int, AsyncExtrinsicReceipt] | tuple[None, None]]:
-        if not subnets:
-            return [(None, None)]
-
-        tasks = [
-            asyncio.wait_for(
-                self.sign_and_send_extrinsic(
-                    subnet.call_buy if call_is_buy else subnet.call_sell
-                ),
+        self,
+        subnets_to_stake: list[SubnetConfig],
+        subnets_to_unstake: list[SubnetConfig],
+    ) -> tuple[
+        list[tuple[int, CachedReceipt | None]],
+        list[tuple[int, CachedReceipt | None]],
+    ]:
+        """
+        Submit every buy and sell call of this block as one extrinsic.
+
+        Returns (responses_for_stake, responses_for_unstake); all responses share
+        the same receipt, per-netuid events are picked out when processing them.
+        """
+        calls = [
+            self.subnet_runtime[subnet.netuid].call_buy for subnet in subnets_to_stake
+        ] + [
+            self.subnet_runtime[subnet.netuid].call_sell
+            for subnet in subnets_to_unstake
+        ]
+        if not calls:
+            return [], []
+
+        try:
+            receipt = await asyncio.wait_for(
+                self.sign_and_send_batch_extrinsic(calls),
                 timeout=48.0,  # seconds
             )
-            for subnet in subnets
-        ]
+        except Exception as e:
+            netuids = [s.netuid for s in subnets_to_stake + subnets_to_unstake]
+            bt.logging.warning(f"Tx timed out/failed for netuids={netuids}: {e}")
+            receipt = None
+
+        stake_netuids = tuple(s.netuid for s in subnets_to_stake)
+        unstake_netuids = tuple(s.netuid for s in subnets_to_unstake)
+        if receipt is not None and receipt.ok is None:
+            # Included, but the outcome couldn't be read: a fill may have landed, so
+            # book nothing now and re-read the receipt on the next blocks
+            bt.logging.warning(
+                f"Outcome unknown for netuids={stake_netuids + unstake_netuids}, "
+                f"re-reading receipt {receipt.extrinsic_hash} on later blocks"
+            )
+            self._pending_receipts.append(
+                PendingReceipt(receipt, stake_netuids, unstake_netuids)
+            )
+            receipt = None
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if receipt is not None:
+            self._account_extrinsic_fee(receipt, stake_netuids, unstake_netuids)
 
-        out: list[tuple[int, AsyncExtrinsicReceipt] | tuple[None, None]] = []
-        for subnet, res in zip(subnets, results):
-            if isinstance(res, Exception):
-                bt.logging.warning(
-                    f"Tx timed out/failed for netuid={subnet.netuid}: {res}"
+        return (
+            [(subnet.netuid, receipt) for subnet in subnets_to_stake],
+            [(subnet.netuid, receipt) for subnet in subnets_to_unstake],
+        )
+
+    async def resolve_pending_receipts(self) -> None:
+        """
+        Re-read the receipts whose outcome was unknown and book the ones the chain now
+        answers for. After PENDING_RECEIPT_ATTEMPTS unknown re-reads one is booked as failed.
+        """
+        pending, self._pending_receipts = self._pending_receipts, []
+        resolved = await asyncio.gather(
+            *[
+                self._resolve_receipt(
+                    AsyncExtrinsicReceipt(
+                        self.subtensor.substrate,
+                        extrinsic_hash=p.receipt.extrinsic_hash,
+                        block_hash=p.receipt.block_hash,
+                        block_number=p.receipt.block_number,
+                    )
                 )
-                out.append((subnet.netuid, None))
-            else:
-                out.append((subnet.netuid, res))
+                for p in pending
+            ]
+        )
+        responses = []
+        for p, receipt in zip(pending, resolved):
+            if receipt.ok is None:
+                p.attempts += 1
+                if p.attempts < PENDING_RECEIPT_ATTEMPTS:
+                    self._pending_receipts.append(p)
+                    continue
+                bt.logging.error(
+                    f"Receipt {p.receipt.extrinsic_hash} still unreadable after "
+                    f"{p.attempts} attempts, booking it as failed; check netuids="
+                    f"{p.stake_netuids + p.unstake_netuids} against chain"
+                )
+                receipt = replace(receipt, ok=False)
+            # The cached balance predates this outcome, re-read it from chain
+            self._balance_rao = None
+            self._account_extrinsic_fee(receipt, p.stake_netuids, p.unstake_netuids)
+            responses += [
+                self.process_response_stake((netuid, receipt))
+                for netuid in p.stake_netuids
+            ]
+            responses += [
+                self.process_response_unstake((netuid, receipt))
+                for netuid in p.unstake_netuids
+            ]
+        await asyncio.gather(*responses)
 
-        return out
+    def _pending_netuids(self) -> set[int]:
+        return {
+            netuid
+            for p in self._pending_receipts
+            for netuid in p.stake_netuids + p.unstake_netuids
+        }
+
+    def _account_extrinsic_fee(
+        self,
+        receipt: CachedReceipt,
+        stake_netuids: Sequence[int],
+        unstake_netuids: Sequence[int],
+    ) -> None:
+        """
+        Book the extrinsic's fee once (whether ok or not), split pro-rata over its calls.
+
+        Buys carry their share in cost basis, sells in realized PnL as a trading cost;
+        the cached balance pays the whole fee once.
+        """
+        if receipt.fee_rao is not None:
+            fee_rao = receipt.fee_rao
+        else:
+            # Fee unknown (receipt given up on, no fee event): fall back to the measured single-call fee
+            fee_rao = (
+                EXTRINSIC_FEE_RAO_ADD_STAKE
+                if stake_netuids
+                else EXTRINSIC_FEE_RAO_REMOVE_STAKE
+            )
+        self._adjust_balance(-fee_rao)
+
+        netuids = [*stake_netuids, *unstake_netuids]
+        share_rao, remainder_rao = divmod(fee_rao, len(netuids))
+        for i, netuid in enumerate(netuids):
+            part_rao = share_rao + (1 if i < remainder_rao else 0)
+            pos = self.positions.setdefault(netuid, Position(netuid))
+            if i < len(stake_netuids):
+                pos.total_tao_spent_rao += part_rao
+            else:
+                pos.realized_profit_rao -= part_rao
+            self._dirty_netuids.add(netuid)
+
+    async def sign_and_send_batch_extrinsic(
+        self, calls: list[Call], batch_type: str = "force_batch"
+    ) -> CachedReceipt | None:
+        """
+        Sign and submit the calls as one Utility batch extrinsic: one signature,
+        one nonce and one submission per block instead of one per subnet.
+
+        Defaults to force_batch, which keeps going when one item fails, so a limit
+        order that can't fill doesn't revert the other subnets' orders (batch_all would).
+        A single call is sent as is, without the batch wrapper.
+        """
+        if len(calls) == 1:
+            return await self.sign_and_send_extrinsic(calls[0])
+        batch_call = await self.subtensor.compose_call(
+            call_module="Utility",
+            call_function=batch_type,
+            call_params={"calls": [call.value for call in calls]},
+        )
+        return await self.sign_and_send_extrinsic(batch_call)
 
     async def process_response_stake(
-        self, response: tuple[int, AsyncExtrinsicReceipt] | tuple[None, None]
+        self, response: tuple[int, CachedReceipt | None]
     ):
         response_netuid, receipt = response
         if response_netuid is None or receipt is None:
             return
 
-        current_position = self.positions.get(response_netuid)
-        if current_position is None:
-            self.positions[response_netuid] = Position(response_netuid)
-            current_position = self.positions.get(response_netuid)
-
-        # Account for weight-based fee once per extrinsic receipt (whether ok or not)
-        current_position.total_tao_spent_rao += EXTRINSIC_FEE_TAO_ADD_STAKE.rao
+        # The extrinsic fee share was already booked by _account_extrinsic_fee
+        current_position = self.positions.setdefault(
+            response_netuid, Position(response_netuid)
+        )
 
-        ok = await receipt.is_success
-        if not ok:
+        if not receipt.ok:
             bt.logging.warning(
-                f"Extrinsic failed, adding fee to position: {current_position}"
+                f"Stake extrinsic failed; fee share accounted. Position: {current_position}"
             )
-            await save_positions(self)
             return
 
-        bt.logging.debug(f"Processing response for stake: {response}")
-        events = await self.subtensor.substrate.get_events(receipt.block_hash)
-        bt.logging.debug("EVENTS:")
-        for event in events:
-            # bt.logging.debug(event)
-            stake_event = StakeAddedEvent.from_substrate_event(event)
-            if stake_event is None:
-                continue
-            if stake_event.coldkey_ss58 != self.wallet.coldkey.ss58_address:
-                continue
-            if stake_event.netuid != response_netuid:
-                continue
-            bt.logging.debug(stake_event)
-            bt.logging.debug(f"Positons before: {current_position}")
+        log_debug = debug_enabled()
+        if log_debug:
+            bt.logging.debug(f"Processing response for stake: {response}")
+        added_events = receipt.stake_events.get((StakeAddedEvent, response_netuid), ())
+        for stake_event in added_events:
+            if log_debug:
+                bt.logging.debug(stake_event)
+                bt.logging.debug(f"Positons before: {current_position}")
             current_position.total_alpha_rao += stake_event.alpha_received_rao
             current_position.total_tao_spent_rao += stake_event.staking_amount_rao
-            await save_positions(self)
-            bt.logging.debug(f"Positons after: {current_position}")
-
-    async def sign_and_send_extrinsic(self, call: Call) -> AsyncExtrinsicReceipt | None:
+            self._adjust_balance(-stake_event.staking_amount_rao)
+            if log_debug:
+                bt.logging.debug(f"Positons after: {current_position}")
+
+    def _index_stake_events(
+        self, events: list[dict]
+    ) -> dict[tuple[type, int], list[StakeAddedEvent | StakeRemovedEvent]]:
+        """Parse the extrinsic's events once, keeping our stake events keyed by (event type, netuid)."""
+        coldkey_ss58 = self.wallet.coldkey.ss58_address
+        index: dict[tuple[type, int], list[StakeAddedEvent | StakeRemovedEvent]] = (
+            defaultdict(list)
+        )
+        for event in events:
+            stake_event = parse_stake_event(event)
+            if stake_event is None or stake_event.coldkey_ss58 != coldkey_ss58:
+                continue
+            index[(type(stake_event), stake_event.netuid)].append(stake_event)
+        return index
+
+    def _adjust_balance(self, delta_rao: int) -> None:
+        # Keep the cached free balance in step with our own extrinsics between chain refreshes
+        if self._balance_rao is not None:
+            self._balance_rao += delta_rao
+
+    async def _resolve_receipt(self, receipt: AsyncExtrinsicReceipt) -> CachedReceipt:
+        """
+        Await the receipt's result once, bounded as a whole by RECEIPT_TIMEOUT_SECONDS.
+        A stalled node or read error leaves ok=None (unknown), not failed: the extrinsic
+        is already included and may have filled. Downstream code only reads the plain fields.
+        """
         try:
-            extrinsic_data = {"call": call, "keypair": self.wallet.coldkey}
-
-            extrinsic_data["era"] = {"period": 4, "current": self.current_block - 2}
-            extrinsic = await self.subtensor.substrate.create_signed_extrinsic(
-                **extrinsic_data
-            )
-            bt.logging.debug(f"Prepared extrinsic: {extrinsic}")
-            response = await self.subtensor.substrate.submit_extrinsic(
-                extrinsic=extrinsic,
-                wait_for_inclusion=True,
-                wait_for_finalization=False,
-            )
-            ok = await response.is_success
-            bt.logging.info(
-                f"Response: {response} | succes: {ok} | error: {await response.error_message if not ok else None}"
+            ok, error, events, fee_rao = await asyncio.wait_for(
+                self._read_receipt(receipt), timeout=RECEIPT_TIMEOUT_SECONDS
             )
-            return response
+        except TimeoutError:
+            bt.logging.warning(f"Timed out waiting for receipt result: {receipt}")
+            ok, error, events, fee_rao = None, "timed out", [], None
         except Exception as e:
-            bt.logging.error(f"Error during sending extrinsic: {e}")
-            return None
+            bt.logging.warning(f"Failed to read receipt result: {receipt}: {e}")
+            ok, error, events, fee_rao = None, str(e), [], None
+        return CachedReceipt(
+            ok=ok,
+            error_message=error,
+            block_hash=receipt.block_hash,
+            extrinsic_hash=receipt.extrinsic_hash,
+            block_number=receipt.block_number,
+            fee_rao=int(fee_rao) if fee_rao is not None else None,
+            stake_events=self._index_stake_events(events) if ok else {},
+        )
+
+    @staticmethod
+    async def _read_receipt(
+        receipt: AsyncExtrinsicReceipt,
+    ) -> tuple[bool | None, dict | str | None, list, int | None]:
+        # is_success fetches and processes our extrinsic's events; error_message,
+        # triggered_events and total_fee_amount are memoized by it, so awaiting them after
+        # is cheap. Not gathered: concurrent first awaits would each run process_events.
+        # None when no events could be matched to the extrinsic: outcome unknown
+        ok = await receipt.is_success
+        error = None if ok else await receipt.error_message
+        # Only the events of our own extrinsic (matched on extrinsic_idx), not the whole block
+        events = await receipt.triggered_events
+        # Set from TransactionFeePaid by the same event processing, None if absent
+        fee_rao = await receipt.total_fee_amount
+        return ok, error, events, fee_rao
+
+    async def sign_and_send_extrinsic(self, call: Call) -> CachedReceipt | None:
+        era = self._era
+        for attempt in range(SIGN_AND_SEND_ATTEMPTS):
+            try:
+                extrinsic = await self.subtensor.substrate.create_signed_extrinsic(
+                    call=call,
+                    keypair=self.wallet.coldkey,
+                    era=era,
+                )
+                if debug_enabled():
+                    bt.logging.debug(f"Prepared extrinsic: {extrinsic}")
+                response = await self.subtensor.substrate.submit_extrinsic(
+                    extrinsic=extrinsic,
+                    wait_for_inclusion=True,
+                    wait_for_finalization=False,
+                )
+                receipt = await self._resolve_receipt(response)
+                bt.logging.info(
+                    f"Response: {response} | succes: {receipt.ok} | error: {receipt.error_message}"
+                )
+                return receipt
+            except Exception as e:
+                if (
+                    "ancient birth block" not in str(e).lower()
+                    or attempt == SIGN_AND_SEND_ATTEMPTS - 1
+                ):
+                    bt.logging.error(f"Error during sending extrinsic: {e}")
+                    return None
+                # Era anchored on a block the node already considers too old, re-anchor newer
+                era = {
+                    "period": 4,
+                    "current": max(era["current"] + 1, self.current_block - 2),
+                }
+                bt.logging.warning(
+                    f"Ancient birth block, retrying with era current={era['current']}"
+                )
+                await asyncio.sleep(0.1 * 2**attempt)
+        return None
 
     async def create_calls_buy(self):
-        for subnet_config in self.subnets_config:
-            subnet_config.call_buy = await SubtensorModule(
-                self.subtensor
-            ).add_stake_limit(
-                hotkey=subnet_config.validator_hotkey,
-                netuid=subnet_config.netuid,
-                amount_staked=subnet_config.amount_tao_to_stake_buy.rao,
-                limit_price=subnet_config.limit_price_buy.rao,
-                allow_partial=True,
-            )
-            bt.logging.info(f"Subnets config with calls: {subnet_config}")
+        calls = await asyncio.gather(
+            *[
+                self._pallet.add_stake_limit(
+                    hotkey=subnet_config.validator_hotkey,
+                    netuid=subnet_config.netuid,
+                    amount_staked=subnet_config.amount_tao_to_stake_buy.rao,
+                    limit_price=subnet_config.limit_price_buy.rao,
+                    allow_partial=True,
+                )
+                for subnet_config in self.subnets_config
+            ]
+        )
+        for subnet_config, call in zip(self.subnets_config, calls):
+            self.subnet_runtime[subnet_config.netuid] = SubnetRuntime(call_buy=call)
+            bt.logging.info(f"Subnets config with calls: {subnet_config} {call}")
 
     async def get_subnets_to_stake(self) -> list[SubnetConfig]:
         subnets_to_stake = []
-        current_balance = await self.subtensor.get_balance(
-            self.wallet.coldkey.ss58_address
-        )
-        if current_balance.tao <= 0.01:
-            bt.logging.warning(f"Not eneough balance: {current_balance}")
+        log_debug = debug_enabled()
+        if self._balance_rao <= MIN_BALANCE_RAO:
+            bt.logging.warning(
+                f"Not eneough balance: {bt.Balance.from_rao(self._balance_rao)}"
+            )
             return subnets_to_stake
+        pending_netuids = self._pending_netuids()
         for subnet_config in self.subnets_config:
+            if subnet_config.netuid in pending_netuids:
+                # Last order's outcome unknown, don't stack another one on top
+                continue
             position = self.positions.get(subnet_config.netuid)
-            if position is not None:
-                total_alpha = position.total_alpha.tao
-            else:
-                total_alpha = 0.0
+            total_alpha_rao = position.total_alpha_rao if position is not None else 0
             if (
                 subnet_config.max_alpha_position is not None
-                and subnet_config.max_alpha_position.tao <= total_alpha
+                and subnet_config.max_alpha_position.rao <= total_alpha_rao
             ):
-                bt.logging.debug(
-                    f"Current postion achived max allowed alpha on subnet {subnet_config.netuid}: {subnet_config.max_alpha_position}"
-                )
+                if log_debug:
+                    bt.logging.debug(
+                        f"Current postion achived max allowed alpha on subnet {subnet_config.netuid}: {subnet_config.max_alpha_position}"
+                    )
                 continue
 
             current_price_on_subnet = self.prices.get(subnet_config.netuid)
             if current_price_on_subnet is None:
                 continue
-            if current_price_on_subnet.tao <= subnet_config.activation_price_buy.tao:
+            if current_price_on_subnet.rao <= subnet_config.activation_price_buy.rao:
                 subnets_to_stake.append(subnet_config)
-            else:
+            elif log_debug:
                 bt.logging.debug(
                     f"current_price_on_subnet: {current_price_on_subnet} > activation_price_buy: {subnet_config.activation_price_buy}"
                 )
-        if subnets_to_stake:
+        if subnets_to_stake and log_debug:
             bt.logging.debug(
                 f"Achieved actiavation price for subnets to stake: [blue]{subnets_to_stake}[/blue]"
             )
@@ -415,6 +689,18 @@ class ScalpRunner:
             f"combined=[green]{total}[/green]"
         )
 
+    async def refresh_balance(self):
+        if (
+            self._balance_rao is not None
+            and self.current_block - self._balance_block < BALANCE_REFRESH_BLOCKS
+        ):
+            return
+        chain_balance = await self.subtensor.get_balance(
+            self.wallet.coldkey.ss58_address
+        )
+        self._balance_rao = int(chain_balance.rao)
+        self._balance_block = self.current_block
+
     async def refresh_prices(self):
         try:
             infos = await self.subtensor.all_subnets()
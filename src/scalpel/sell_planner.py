@@ -1,15 +1,16 @@
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_CEILING, getcontext
+from functools import lru_cache
 import math
 from typing import Optional
 
 import bittensor as bt
 from bittensor.core.chain_data.dynamic_info import DynamicInfo
 
-getcontext().prec = 50
-
 RAO_PER_TAO = 10**9
 
+# Sell plans memoized across blocks; a few entries per subnet covers repeated pool states
+SELL_PLAN_CACHE_SIZE = 1024
+
 # 0.05% = 500 ppm (parts per million)
 PPM_DEN = 1_000_000
 ALPHA_FEE_PPM = 500
@@ -58,28 +59,14 @@ def net_alpha_into_pool_rao(alpha_gross_rao: int) -> int:
 def max_gross_alpha_for_net_limit(net_limit_rao: int) -> int:
     """
     Max gross alpha such that net_alpha_into_pool_rao(gross) <= net_limit_rao.
-    Uses a tight integer conversion to handle fee rounding.
+
+    net(gross) = gross - ceil(gross * fee / PPM_DEN) = floor(gross * (PPM_DEN - fee) / PPM_DEN),
+    so net(gross) <= L  <=>  gross * (PPM_DEN - fee) < (L + 1) * PPM_DEN, exact in integers.
     """
     if net_limit_rao <= 0:
         return 0
 
-    denom = PPM_DEN - ALPHA_FEE_PPM
-
-    # Approximate start (floor)
-    gross = (net_limit_rao * PPM_DEN) // denom
-
-    # Nudge upward while still valid
-    while True:
-        cand = gross + 1
-        if net_alpha_into_pool_rao(cand) <= net_limit_rao:
-            gross = cand
-            continue
-        break
-
-    while gross > 0 and net_alpha_into_pool_rao(gross) > net_limit_rao:
-        gross -= 1
-
-    return gross
+    return ((net_limit_rao + 1) * PPM_DEN - 1) // (PPM_DEN - ALPHA_FEE_PPM)
 
 
 def spot_price_rao_from_reserves(alpha_in_rao: int, tao_in_rao: int) -> int:
@@ -98,8 +85,8 @@ def compute_activation_and_limit_for_fill(
     position_total_alpha_rao: int,
     position_total_tao_spent_rao: int,
     gross_alpha_fill_rao: int,
-    pct_profit: float,
-    slippage_sell_pct: float,
+    pct_profit_ppm: int,
+    slippage_sell_ppm: int,
     flat_fee_sell_rao: int,
 ) -> tuple[int, int, int, int]:
     """
@@ -110,6 +97,9 @@ def compute_activation_and_limit_for_fill(
     Guarantee:
       If gross_alpha_fill_rao fills at >= limit_price_rao in this extrinsic,
       then net outcome >= pct_profit after alpha-fee and flat fee.
+
+    pct_profit and slippage_sell_pct come in as ppm integers (1.05 -> 1_050_000),
+    so everything below is exact integer math.
     """
     if position_total_alpha_rao <= 0:
         raise ValueError("Position has no alpha.")
@@ -118,9 +108,9 @@ def compute_activation_and_limit_for_fill(
     if gross_alpha_fill_rao > position_total_alpha_rao:
         gross_alpha_fill_rao = position_total_alpha_rao
 
-    if pct_profit <= 1.0:
+    if pct_profit_ppm <= PPM_DEN:
         raise ValueError("pct_profit must be > 1.0")
-    if not (0.0 <= slippage_sell_pct < 1.0):
+    if not (0 <= slippage_sell_ppm < PPM_DEN):
         raise ValueError("slippage_sell_pct must be in [0, 1)")
 
     # Alpha fee is paid in alpha; conservative rounding up.
@@ -137,22 +127,17 @@ def compute_activation_and_limit_for_fill(
     )
 
     # Required proceeds to meet profit + cover flat fee
-    required_proceeds = int(
-        (Decimal(assumed_cost_basis) * Decimal(str(pct_profit))).to_integral_value(
-            rounding=ROUND_CEILING
-        )
+    required_proceeds = ceil_div(
+        assumed_cost_basis * pct_profit_ppm, PPM_DEN
     ) + int(flat_fee_sell_rao)
 
     # Minimal limit price so that:
     # floor(limit_price * effective_alpha / 1e9) >= required_proceeds
     limit_price_rao = ceil_div(required_proceeds * RAO_PER_TAO, effective_alpha)
 
-    # Activation to tolerate slippage down to limit
-    sl_mult = Decimal("1") - Decimal(str(slippage_sell_pct))
-    if sl_mult <= 0:
-        raise ValueError("Invalid slippage multiplier")
-    activation_price_rao = int(
-        (Decimal(limit_price_rao) / sl_mult).to_integral_value(rounding=ROUND_CEILING)
+    # Activation to tolerate slippage down to limit: ceil(limit / (1 - slippage))
+    activation_price_rao = ceil_div(
+        limit_price_rao * PPM_DEN, PPM_DEN - slippage_sell_ppm
     )
 
     return activation_price_rao, limit_price_rao, assumed_cost_basis, required_proceeds
@@ -174,8 +159,24 @@ def estimate_max_fill_under_limit(
       - Assumes trade continues until final spot reaches the limit.
       - Does NOT include flat extrinsic fee.
     """
-    A = int(dynamic.alpha_in.rao)
-    T = int(dynamic.tao_in.rao)
+    return estimate_max_fill_for_reserves(
+        alpha_in_rao=int(dynamic.alpha_in.rao),
+        tao_in_rao=int(dynamic.tao_in.rao),
+        limit_price_rao=limit_price_rao,
+        max_gross_sell_rao=max_gross_sell_rao,
+    )
+
+
+def estimate_max_fill_for_reserves(
+    *,
+    alpha_in_rao: int,
+    tao_in_rao: int,
+    limit_price_rao: int,
+    max_gross_sell_rao: int,
+) -> tuple[int, int, int]:
+    """estimate_max_fill_under_limit on plain pool reserves (rao)."""
+    A = alpha_in_rao
+    T = tao_in_rao
     if A <= 0 or T <= 0 or limit_price_rao <= 0:
         return 0, 0, 0
 
@@ -210,8 +211,8 @@ def build_sell_plan(
     dynamic: DynamicInfo,
     position_total_alpha_rao: int,
     position_total_tao_spent_rao: int,
-    pct_profit: float,
-    slippage_sell_pct: float,
+    pct_profit_ppm: int,
+    slippage_sell_ppm: int,
     flat_fee_sell_rao: int,
     min_gross_fill_rao: int = 0,
     max_sell_alpha_rao: int | None = None,
@@ -224,6 +225,70 @@ def build_sell_plan(
       - iterates until (assumed_fill == estimated_fill) or converges to 0.
 
     Returns None if no profitable / meaningful fill exists under current pool state.
+    The plan only depends on the pool reserves out of `dynamic`, results are cached
+    on those scalars so an unchanged pool/position skips the iteration. Only the
+    rao ints are cached; bt.Balance is mutable, so fresh ones are built per call.
+    """
+    plan_rao = _build_sell_plan_for_reserves(
+        netuid=netuid,
+        alpha_in_rao=int(dynamic.alpha_in.rao),
+        tao_in_rao=int(dynamic.tao_in.rao),
+        position_total_alpha_rao=position_total_alpha_rao,
+        position_total_tao_spent_rao=position_total_tao_spent_rao,
+        pct_profit_ppm=pct_profit_ppm,
+        slippage_sell_ppm=slippage_sell_ppm,
+        flat_fee_sell_rao=flat_fee_sell_rao,
+        min_gross_fill_rao=min_gross_fill_rao,
+        max_sell_alpha_rao=max_sell_alpha_rao,
+        max_iters=max_iters,
+    )
+    if plan_rao is None:
+        return None
+
+    (
+        activation_rao,
+        limit_rao,
+        est_gross_fill,
+        est_net_alpha,
+        est_tao_out,
+        cost_basis_rao,
+        required_proceeds_rao,
+    ) = plan_rao
+    expected_after_fee = max(0, est_tao_out - flat_fee_sell_rao)
+    fill_pct = 100.0 * est_gross_fill / position_total_alpha_rao
+
+    return SellPlan(
+        netuid=netuid,
+        activation_price=bt.Balance.from_rao(activation_rao, netuid=0),
+        limit_price=bt.Balance.from_rao(limit_rao, netuid=0),
+        amount_alpha_to_sell_rao=est_gross_fill,
+        amount_alpha_into_pool_rao=est_net_alpha,
+        expected_tao_out_rao=est_tao_out,
+        expected_tao_out_after_flat_fee_rao=expected_after_fee,
+        expected_fill_pct_of_position=fill_pct,
+        assumed_cost_basis_rao=cost_basis_rao,
+        required_proceeds_rao=required_proceeds_rao,
+    )
+
+
+@lru_cache(maxsize=SELL_PLAN_CACHE_SIZE)
+def _build_sell_plan_for_reserves(
+    *,
+    netuid: int,
+    alpha_in_rao: int,
+    tao_in_rao: int,
+    position_total_alpha_rao: int,
+    position_total_tao_spent_rao: int,
+    pct_profit_ppm: int,
+    slippage_sell_ppm: int,
+    flat_fee_sell_rao: int,
+    min_gross_fill_rao: int,
+    max_sell_alpha_rao: int | None,
+    max_iters: int,
+) -> Optional[tuple[int, int, int, int, int, int, int]]:
+    """
+    Rao-only core of build_sell_plan, returns
+    (activation, limit, gross_fill, net_alpha, tao_out, cost_basis, required_proceeds).
     """
     if position_total_alpha_rao <= 0:
         return None
@@ -242,14 +307,15 @@ def build_sell_plan(
                 position_total_alpha_rao=position_total_alpha_rao,
                 position_total_tao_spent_rao=position_total_tao_spent_rao,
                 gross_alpha_fill_rao=assumed_gross_fill,
-                pct_profit=pct_profit,
-                slippage_sell_pct=slippage_sell_pct,
+                pct_profit_ppm=pct_profit_ppm,
+                slippage_sell_ppm=slippage_sell_ppm,
                 flat_fee_sell_rao=flat_fee_sell_rao,
             )
         )
 
-        est_gross_fill, est_net_alpha, est_tao_out = estimate_max_fill_under_limit(
-            dynamic=dynamic,
+        est_gross_fill, est_net_alpha, est_tao_out = estimate_max_fill_for_reserves(
+            alpha_in_rao=alpha_in_rao,
+            tao_in_rao=tao_in_rao,
             limit_price_rao=limit_rao,
             max_gross_sell_rao=sell_cap,
         )
@@ -262,20 +328,14 @@ def build_sell_plan(
 
         # Fixed point reached
         if est_gross_fill == assumed_gross_fill:
-            expected_after_fee = max(0, est_tao_out - flat_fee_sell_rao)
-            fill_pct = 100.0 * est_gross_fill / position_total_alpha_rao
-
-            return SellPlan(
-                netuid=netuid,
-                activation_price=bt.Balance.from_rao(activation_rao, netuid=0),
-                limit_price=bt.Balance.from_rao(limit_rao, netuid=0),
-                amount_alpha_to_sell_rao=est_gross_fill,
-                amount_alpha_into_pool_rao=est_net_alpha,
-                expected_tao_out_rao=est_tao_out,
-                expected_tao_out_after_flat_fee_rao=expected_after_fee,
-                expected_fill_pct_of_position=fill_pct,
-                assumed_cost_basis_rao=cost_basis_rao,
-                required_proceeds_rao=required_proceeds_rao,
+            return (
+                activation_rao,
+                limit_rao,
+                est_gross_fill,
+                est_net_alpha,
+                est_tao_out,
+                cost_basis_rao,
+                required_proceeds_rao,
             )
 
         # Monotone decrease; update and continue
@@ -293,31 +353,26 @@ def build_sell_plan(
             position_total_alpha_rao=position_total_alpha_rao,
             position_total_tao_spent_rao=position_total_tao_spent_rao,
             gross_alpha_fill_rao=assumed_gross_fill,
-            pct_profit=pct_profit,
-            slippage_sell_pct=slippage_sell_pct,
+            pct_profit_ppm=pct_profit_ppm,
+            slippage_sell_ppm=slippage_sell_ppm,
             flat_fee_sell_rao=flat_fee_sell_rao,
         )
     )
-    est_gross_fill, est_net_alpha, est_tao_out = estimate_max_fill_under_limit(
-        dynamic=dynamic,
+    est_gross_fill, est_net_alpha, est_tao_out = estimate_max_fill_for_reserves(
+        alpha_in_rao=alpha_in_rao,
+        tao_in_rao=tao_in_rao,
         limit_price_rao=limit_rao,
         max_gross_sell_rao=sell_cap,
     )
     if est_gross_fill <= 0:
         return None
 
-    expected_after_fee = max(0, est_tao_out - flat_fee_sell_rao)
-    fill_pct = 100.0 * est_gross_fill / position_total_alpha_rao
-
-    return SellPlan(
-        netuid=netuid,
-        activation_price=bt.Balance.from_rao(activation_rao, netuid=0),
-        limit_price=bt.Balance.from_rao(limit_rao, netuid=0),
-        amount_alpha_to_sell_rao=est_gross_fill,
-        amount_alpha_into_pool_rao=est_net_alpha,
-        expected_tao_out_rao=est_tao_out,
-        expected_tao_out_after_flat_fee_rao=expected_after_fee,
-        expected_fill_pct_of_position=fill_pct,
-        assumed_cost_basis_rao=cost_basis_rao,
-        required_proceeds_rao=required_proceeds_rao,
+    return (
+        activation_rao,
+        limit_rao,
+        est_gross_fill,
+        est_net_alpha,
+        est_tao_out,
+        cost_basis_rao,
+        required_proceeds_rao,
     )
@@ -1,10 +1,24 @@
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, field, fields
+from functools import lru_cache
 import json
+import os
+from pathlib import Path
+from typing import get_args
 import bittensor as bt
 from bittensor.core.extrinsics.pallets.base import Call
 
+from scalpel.sell_planner import PPM_DEN
 
-@dataclass
+# Resolved once at import so a later chdir can't point the loader elsewhere
+CONFIG_PATH = Path(
+    os.getenv("SCALPEL_SUBNETS_CONFIG", "subnets_config.json")
+).resolve()
+
+# Validator used when a subnet entry doesn't name one
+DEFAULT_VALIDATOR_HOTKEY = "5E2LP6EnZ54m3wS8s1yPvD5c3xo71kQroBw7aUVK32TKeZ5u"
+
+
+@dataclass(slots=True)
 class SubnetConfig:
     # Required fields (no defaults)
     netuid: int
@@ -35,13 +49,17 @@ class SubnetConfig:
     min_sell_alpha: float = 0.0
 
     # Optional fields (with defaults)
-    validator_hotkey: str | None = None
+    validator_hotkey: str | None = DEFAULT_VALIDATOR_HOTKEY
     amount_tao_to_stake_buy: bt.Balance | None = None
-    call_buy: Call | None = None
-    call_sell: Call | None = None
 
     max_alpha_position: bt.Balance | None = None
 
+    # Derived in __post_init__ (declared so the slotted class has room for them)
+    min_sell_alpha_rao: int = field(init=False, repr=False)
+    pct_profit_ppm: int = field(init=False, repr=False)
+    slippage_sell_ppm: int = field(init=False, repr=False)
+    sell_pct_ppm: int = field(init=False, repr=False)
+
     # Future sell functionality (currently unused)
     # activation_price_sell: bt.Balance | None = None
     # limit_price_sell: bt.Balance | None = None
@@ -57,16 +75,14 @@ class SubnetConfig:
             float(self.activation_price_buy), netuid=0
         )
 
-        self.validator_hotkey = (
-            self.validator_hotkey
-            if self.validator_hotkey is not None
-            else "5E2LP6EnZ54m3wS8s1yPvD5c3xo71kQroBw7aUVK32TKeZ5u"
-        )
+        if self.validator_hotkey is None:
+            # Explicit null in the JSON
+            self.validator_hotkey = DEFAULT_VALIDATOR_HOTKEY
         self.amount_tao_to_stake_buy = bt.Balance.from_tao(
             float(
                 self.amount_tao_to_stake_buy
                 if self.amount_tao_to_stake_buy is not None
-                else "1.0"
+                else 1.0
             ),
             netuid=0,
         )
@@ -74,6 +90,10 @@ class SubnetConfig:
         self.slippage_sell_pct = float(self.slippage_sell_pct)
         self.sell_pct = float(self.sell_pct)
         self.min_sell_alpha_rao = int(float(self.min_sell_alpha) * 1_000_000_000)
+        # Fixed-point (parts per million) copies for the integer sell-plan math
+        self.pct_profit_ppm = round(self.pct_profit * PPM_DEN)
+        self.slippage_sell_ppm = round(self.slippage_sell_pct * PPM_DEN)
+        self.sell_pct_ppm = round(self.sell_pct * PPM_DEN)
 
         if self.max_alpha_position is not None:
             self.max_alpha_position = bt.Balance.from_float(
@@ -112,6 +132,19 @@ class SubnetConfig:
                 f"must be between 0 and 1. Example: 0.05 means 5% slippage."
             )
 
+        # The sell planner works on the ppm-rounded values, they must stay in range too
+        if self.pct_profit_ppm <= PPM_DEN:
+            raise ValueError(
+                f"Subnet {self.netuid}: pct_profit ({self.pct_profit}) rounds to "
+                f"{self.pct_profit_ppm} ppm, must be > {PPM_DEN} ppm. "
+                f"Use at least 1.000001."
+            )
+        if not (0 <= self.slippage_sell_ppm < PPM_DEN):
+            raise ValueError(
+                f"Subnet {self.netuid}: slippage_sell_pct ({self.slippage_sell_pct}) "
+                f"rounds to {self.slippage_sell_ppm} ppm, must be below {PPM_DEN} ppm."
+            )
+
         # Critical: Check if pct_profit and slippage would result in a loss
         # Net multiplier after profit and slippage
         net_multiplier = self.pct_profit * (1 - self.slippage_sell_pct)
@@ -144,16 +177,89 @@ class SubnetConfig:
             )
 
 
-def get_subnet_configs() -> list[SubnetConfig]:
-    configs = []
-    with open("subnets_config.json", "r") as file:
-        subnets_config = json.load(file)
-        for subnet_config in subnets_config:
-            config = SubnetConfig(**subnet_config)
-            bt.logging.debug(f"{config}")
-            configs.append(config)
+@dataclass(slots=True)
+class SubnetRuntime:
+    """Per-subnet calls the runner builds and rebuilds, kept off the read-only config."""
+
+    call_buy: Call | None = None
+    call_sell: Call | None = None
+
+
+# JSON value types accepted per SubnetConfig annotation; Balances are given in TAO.
+# bool is rejected separately since it subclasses int.
+_JSON_TYPES: dict[type, tuple[type, ...]] = {
+    int: (int,),
+    float: (int, float),
+    bt.Balance: (int, float),
+    str: (str,),
+}
+
+
+def _json_types(annotation: object) -> tuple[type, ...]:
+    accepted: tuple[type, ...] = ()
+    for member in get_args(annotation) or (annotation,):
+        accepted += (member,) if member is type(None) else _JSON_TYPES[member]
+    return accepted
+
+
+# Derived from the dataclass so a new field is accepted without touching the loader
+_SUBNET_FIELD_TYPES: dict[str, tuple[type, ...]] = {
+    f.name: _json_types(f.type) for f in fields(SubnetConfig) if f.init
+}
+_REQUIRED_SUBNET_FIELDS = tuple(
+    f.name
+    for f in fields(SubnetConfig)
+    if f.init and f.default is MISSING and f.default_factory is MISSING
+)
+
+
+def _check_subnet_record(index: int, subnet_config: dict) -> None:
+    """Raise ValueError naming the file, entry and field if a record is mis-shaped."""
+    where = f"{CONFIG_PATH}: subnet entry [{index}]"
+    for name in _REQUIRED_SUBNET_FIELDS:
+        if name not in subnet_config:
+            raise ValueError(f"{where}: missing required field '{name}'")
+    for name, value in subnet_config.items():
+        expected = _SUBNET_FIELD_TYPES.get(name)
+        if expected is None:
+            raise ValueError(f"{where}: unknown field '{name}'")
+        if isinstance(value, bool) or not isinstance(value, expected):
+            names = " or ".join(
+                "null" if t is type(None) else t.__name__ for t in expected
+            )
+            raise ValueError(
+                f"{where}: field '{name}' must be {names}, got {type(value).__name__}"
+            )
+
+
+@lru_cache(maxsize=1)
+def get_subnet_configs() -> tuple[SubnetConfig, ...]:
+    """Parse CONFIG_PATH once per process; later calls return the same configs."""
+    subnets_config = json.loads(CONFIG_PATH.read_bytes())
+    # Reject a malformed file as a whole before building any config
+    if not isinstance(subnets_config, list) or not all(
+        isinstance(subnet_config, dict) for subnet_config in subnets_config
+    ):
+        raise ValueError(f"{CONFIG_PATH}: expected a JSON array of subnet objects")
+    for index, subnet_config in enumerate(subnets_config):
+        _check_subnet_record(index, subnet_config)
+    # Shared by every caller, so handed out immutable
+    configs = tuple(SubnetConfig(**subnet_config) for subnet_config in subnets_config)
+    # One summary line; the runner logs each config with its prepared call at startup
+    bt.logging.debug(f"Loaded {len(configs)} subnet configs")
     return configs
 
 
+def invalidate_subnet_configs() -> None:
+    """Drop the cached configs so the next get_subnet_configs() re-reads the file."""
+    get_subnet_configs.cache_clear()
+
+
+def reload_subnet_configs() -> tuple[SubnetConfig, ...]:
+    """Re-read CONFIG_PATH now and return the fresh configs."""
+    invalidate_subnet_configs()
+    return get_subnet_configs()
+
+
 if __name__ == "__main__":
     get_subnet_configs()
@@ -0,0 +1,133 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("bittensor")
+
+from scalpel import positions_persistence  # noqa: E402
+from scalpel.models import Position  # noqa: E402
+from scalpel.positions_persistence import (  # noqa: E402
+    load_positions,
+    positions_log_path,
+    save_positions,
+)
+
+
+def _runner(tmp_path) -> SimpleNamespace:
+    # load_positions/save_positions only touch these ScalpRunner attributes
+    return SimpleNamespace(
+        positions_path=tmp_path / "positions.json",
+        positions={},
+        _positions_log_entries=0,
+        _persist_lock=asyncio.Lock(),
+    )
+
+
+def _line(netuid: int, alpha: int, spent: int, profit: int = 0) -> bytes:
+    return (
+        json.dumps(
+            {
+                "netuid": netuid,
+                "total_alpha_rao": alpha,
+                "total_tao_spent_rao": spent,
+                "realized_profit_rao": profit,
+            }
+        ).encode()
+        + b"\n"
+    )
+
+
+def test_log_replays_over_snapshot_last_line_wins(tmp_path):
+    runner = _runner(tmp_path)
+    runner.positions_path.write_text(
+        json.dumps(
+            {
+                "positions": {
+                    "1": {"total_alpha_rao": 10, "total_tao_spent_rao": 5},
+                    "2": {"total_alpha_rao": 20, "total_tao_spent_rao": 8},
+                }
+            }
+        )
+    )
+    positions_log_path(runner.positions_path).write_bytes(
+        _line(1, 11, 6) + _line(3, 30, 9) + _line(1, 12, 7, 1)
+    )
+
+    asyncio.run(load_positions(runner))
+
+    assert runner.positions == {
+        1: Position(1, 12, 7, 1),
+        2: Position(2, 20, 8),
+        3: Position(3, 30, 9),
+    }
+    assert runner._positions_log_entries == 3
+
+
+def test_log_only_without_snapshot(tmp_path):
+    runner = _runner(tmp_path)
+    positions_log_path(runner.positions_path).write_bytes(_line(4, 40, 2))
+
+    asyncio.run(load_positions(runner))
+
+    assert runner.positions == {4: Position(4, 40, 2)}
+
+
+def test_torn_tail_is_skipped_and_truncated(tmp_path):
+    runner = _runner(tmp_path)
+    log_path = positions_log_path(runner.positions_path)
+    good = _line(1, 11, 6)
+    log_path.write_bytes(good + b'{"netuid": 1, "total_alpha_r')
+
+    asyncio.run(load_positions(runner))
+
+    assert runner.positions == {1: Position(1, 11, 6)}
+    assert runner._positions_log_entries == 1
+    assert log_path.read_bytes() == good
+
+    # The next append must land on its own line and replay cleanly
+    runner.positions[1] = Position(1, 13, 7)
+    asyncio.run(save_positions(runner, [1]))
+    reloaded = _runner(tmp_path)
+    asyncio.run(load_positions(reloaded))
+    assert reloaded.positions == {1: Position(1, 13, 7)}
+    assert reloaded._positions_log_entries == 2
+
+
+@pytest.mark.parametrize("snapshot", [b'{"positions": []}', b"[1, 2]", b"{not json"])
+def test_invalid_snapshot_still_replays_log(tmp_path, snapshot):
+    runner = _runner(tmp_path)
+    runner.positions_path.write_bytes(snapshot)
+    positions_log_path(runner.positions_path).write_bytes(_line(5, 50, 3))
+
+    asyncio.run(load_positions(runner))
+
+    assert runner.positions == {5: Position(5, 50, 3)}
+
+
+def test_compaction_syncs_snapshot_before_truncating_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(positions_persistence, "COMPACT_AFTER_LOG_ENTRIES", 2)
+    runner = _runner(tmp_path)
+    log_path = positions_log_path(runner.positions_path)
+    log_sizes_at_fsync = []
+    real_fsync = positions_persistence.os.fsync
+
+    def fsync(fd):
+        log_sizes_at_fsync.append(log_path.stat().st_size)
+        real_fsync(fd)
+
+    monkeypatch.setattr(positions_persistence.os, "fsync", fsync)
+    runner.positions = {1: Position(1, 10, 5), 2: Position(2, 20, 8)}
+    asyncio.run(save_positions(runner, [1, 2]))
+
+    # Snapshot file and its directory entry are synced while the log is still intact
+    assert len(log_sizes_at_fsync) == 2
+    assert all(size > 0 for size in log_sizes_at_fsync)
+    assert log_path.read_bytes() == b""
+    assert runner._positions_log_entries == 0
+    assert not runner.positions_path.with_suffix(".json.tmp").exists()
+
+    reloaded = _runner(tmp_path)
+    asyncio.run(load_positions(reloaded))
+    assert reloaded.positions == runner.positions
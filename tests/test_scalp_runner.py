@@ -0,0 +1,219 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("bittensor")
+
+from scalpel import scalp_runner  # noqa: E402
+from scalpel.models import CachedReceipt, PendingReceipt, StakeAddedEvent  # noqa: E402
+from scalpel.scalp_runner import (  # noqa: E402
+    EXTRINSIC_FEE_RAO_ADD_STAKE,
+    EXTRINSIC_FEE_RAO_REMOVE_STAKE,
+    PENDING_RECEIPT_ATTEMPTS,
+    ScalpRunner,
+)
+
+
+def _runner() -> ScalpRunner:
+    # Skip __init__, it opens the wallet; set only what the code under test touches
+    runner = ScalpRunner.__new__(ScalpRunner)
+    runner.positions = {}
+    runner._dirty_netuids = set()
+    runner._balance_rao = 10**12
+    runner._pending_receipts = []
+    runner.subnet_runtime = {
+        netuid: SimpleNamespace(call_buy=f"buy{netuid}", call_sell=f"sell{netuid}")
+        for netuid in range(1, 5)
+    }
+    runner.subtensor = SimpleNamespace(substrate=None)
+    runner.wallet = SimpleNamespace(coldkey=SimpleNamespace(ss58_address="5Cold"))
+    return runner
+
+
+def _cfg(netuid: int) -> SimpleNamespace:
+    return SimpleNamespace(netuid=netuid)
+
+
+def _receipt(ok, fee_rao=None, stake_events=None) -> CachedReceipt:
+    return CachedReceipt(
+        ok=ok,
+        error_message=None,
+        block_hash="0xblock",
+        extrinsic_hash="0xext",
+        block_number=100,
+        fee_rao=fee_rao,
+        stake_events=stake_events or {},
+    )
+
+
+def _added(netuid: int, tao_rao: int, alpha_rao: int) -> StakeAddedEvent:
+    return StakeAddedEvent("5Cold", "5Hot", tao_rao, alpha_rao, netuid, 0)
+
+
+class _StalledReceipt:
+    block_hash = "0xblock"
+    extrinsic_hash = "0xext"
+    block_number = 100
+
+    @property
+    async def is_success(self):
+        await asyncio.sleep(10)
+
+
+def test_receipt_timeout_is_unknown_not_failed(monkeypatch):
+    monkeypatch.setattr(scalp_runner, "RECEIPT_TIMEOUT_SECONDS", 0.01)
+    receipt = asyncio.run(_runner()._resolve_receipt(_StalledReceipt()))
+    assert receipt.ok is None
+    assert receipt.fee_rao is None
+    assert receipt.stake_events == {}
+    assert receipt.extrinsic_hash == "0xext"
+
+
+def test_unknown_outcome_is_kept_pending_and_not_booked():
+    runner = _runner()
+
+    async def send(calls):
+        return _receipt(ok=None)
+
+    runner.sign_and_send_batch_extrinsic = send
+    stake, unstake = asyncio.run(runner.process_subnets([_cfg(1)], [_cfg(2)]))
+
+    assert stake == [(1, None)]
+    assert unstake == [(2, None)]
+    assert runner.positions == {}
+    assert runner._balance_rao == 10**12
+    assert runner._pending_netuids() == {1, 2}
+
+
+def test_pending_receipt_is_booked_once_resolved():
+    runner = _runner()
+    runner._pending_receipts = [PendingReceipt(_receipt(ok=None), (1,), ())]
+
+    async def resolve(receipt):
+        assert receipt.extrinsic_hash == "0xext"
+        assert receipt.block_hash == "0xblock"
+        return _receipt(
+            ok=True,
+            fee_rao=1_000,
+            stake_events={(StakeAddedEvent, 1): [_added(1, 500_000, 400_000)]},
+        )
+
+    runner._resolve_receipt = resolve
+    asyncio.run(runner.resolve_pending_receipts())
+
+    pos = runner.positions[1]
+    assert pos.total_alpha_rao == 400_000
+    assert pos.total_tao_spent_rao == 500_000 + 1_000
+    assert runner._pending_receipts == []
+    # Re-read from chain on the next refresh instead of adjusting a stale value
+    assert runner._balance_rao is None
+
+
+def test_pending_receipt_is_retried_then_booked_as_failed():
+    runner = _runner()
+    runner._pending_receipts = [PendingReceipt(_receipt(ok=None), (3,), ())]
+
+    async def resolve(receipt):
+        return _receipt(ok=None)
+
+    runner._resolve_receipt = resolve
+    for _ in range(PENDING_RECEIPT_ATTEMPTS - 1):
+        asyncio.run(runner.resolve_pending_receipts())
+        assert runner._pending_netuids() == {3}
+        assert 3 not in runner.positions
+
+    asyncio.run(runner.resolve_pending_receipts())
+    assert runner._pending_receipts == []
+    pos = runner.positions[3]
+    assert pos.total_alpha_rao == 0
+    assert pos.total_tao_spent_rao == EXTRINSIC_FEE_RAO_ADD_STAKE
+
+
+def test_fee_split_pro_rata_buys_into_cost_sells_into_pnl():
+    runner = _runner()
+    runner._account_extrinsic_fee(_receipt(ok=True, fee_rao=10), (1, 2), (3,))
+
+    # 10 over 3 calls: the 1 rao remainder goes to exactly one of them
+    assert runner.positions[1].total_tao_spent_rao == 4
+    assert runner.positions[2].total_tao_spent_rao == 3
+    assert runner.positions[3].realized_profit_rao == -3
+    assert runner.positions[3].total_tao_spent_rao == 0
+    assert runner._balance_rao == 10**12 - 10
+    assert runner._dirty_netuids == {1, 2, 3}
+
+
+@pytest.mark.parametrize(
+    "stake_netuids, unstake_netuids, expected_fee_rao",
+    [
+        ((1,), (2,), EXTRINSIC_FEE_RAO_ADD_STAKE),
+        ((), (2,), EXTRINSIC_FEE_RAO_REMOVE_STAKE),
+    ],
+)
+def test_fee_falls_back_to_flat_estimate(
+    stake_netuids, unstake_netuids, expected_fee_rao
+):
+    runner = _runner()
+    runner._account_extrinsic_fee(
+        _receipt(ok=False, fee_rao=None), stake_netuids, unstake_netuids
+    )
+    assert runner._balance_rao == 10**12 - expected_fee_rao
+    booked = sum(
+        runner.positions[n].total_tao_spent_rao for n in stake_netuids
+    ) - sum(runner.positions[n].realized_profit_rao for n in unstake_netuids)
+    assert booked == expected_fee_rao
+
+
+def test_batch_fee_is_charged_once_not_per_subnet():
+    runner = _runner()
+
+    async def send(calls):
+        assert calls == ["buy1", "buy2", "sell3"]
+        return _receipt(ok=False, fee_rao=3_000)
+
+    runner.sign_and_send_batch_extrinsic = send
+    asyncio.run(runner.process_subnets([_cfg(1), _cfg(2)], [_cfg(3)]))
+
+    assert runner._balance_rao == 10**12 - 3_000
+    assert runner.positions[1].total_tao_spent_rao == 1_000
+    assert runner.positions[2].total_tao_spent_rao == 1_000
+    assert runner.positions[3].realized_profit_rao == -1_000
+
+
+def _sending_runner():
+    runner = _runner()
+    sent, composed = [], []
+
+    async def compose_call(**kwargs):
+        composed.append(kwargs)
+        return "batch"
+
+    async def sign_and_send_extrinsic(call):
+        sent.append(call)
+        return _receipt(ok=True)
+
+    runner.subtensor = SimpleNamespace(substrate=None, compose_call=compose_call)
+    runner.sign_and_send_extrinsic = sign_and_send_extrinsic
+    return runner, sent, composed
+
+
+def test_single_call_is_sent_without_batch_wrapper():
+    runner, sent, composed = _sending_runner()
+    call = SimpleNamespace(value={"call_function": "add_stake_limit"})
+    asyncio.run(runner.sign_and_send_batch_extrinsic([call]))
+    assert sent == [call]
+    assert composed == []
+
+
+def test_several_calls_are_sent_as_one_force_batch():
+    runner, sent, composed = _sending_runner()
+    calls = [SimpleNamespace(value={"n": 1}), SimpleNamespace(value={"n": 2})]
+    asyncio.run(runner.sign_and_send_batch_extrinsic(calls))
+    assert sent == ["batch"]
+    assert composed == [
+        {
+            "call_module": "Utility",
+            "call_function": "force_batch",
+            "call_params": {"calls": [{"n": 1}, {"n": 2}]},
+        }
+    ]
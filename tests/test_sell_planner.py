@@ -0,0 +1,170 @@
+import random
+from decimal import Decimal, ROUND_CEILING, getcontext
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("bittensor")
+
+from scalpel.sell_planner import (  # noqa: E402
+    ALPHA_FEE_PPM,
+    PPM_DEN,
+    RAO_PER_TAO,
+    _build_sell_plan_for_reserves,
+    alpha_fee_rao,
+    build_sell_plan,
+    ceil_div,
+    compute_activation_and_limit_for_fill,
+    max_gross_alpha_for_net_limit,
+    net_alpha_into_pool_rao,
+)
+
+getcontext().prec = 50
+
+
+# Reference implementations: the Decimal / nudge-loop versions the integer code replaced
+
+
+def ref_max_gross_alpha_for_net_limit(net_limit_rao: int) -> int:
+    if net_limit_rao <= 0:
+        return 0
+    gross = (net_limit_rao * PPM_DEN) // (PPM_DEN - ALPHA_FEE_PPM)
+    while net_alpha_into_pool_rao(gross + 1) <= net_limit_rao:
+        gross += 1
+    while gross > 0 and net_alpha_into_pool_rao(gross) > net_limit_rao:
+        gross -= 1
+    return gross
+
+
+def ref_activation_and_limit(
+    *,
+    position_total_alpha_rao: int,
+    position_total_tao_spent_rao: int,
+    gross_alpha_fill_rao: int,
+    pct_profit: float,
+    slippage_sell_pct: float,
+    flat_fee_sell_rao: int,
+) -> tuple[int, int, int, int]:
+    gross_alpha_fill_rao = min(gross_alpha_fill_rao, position_total_alpha_rao)
+    effective_alpha = gross_alpha_fill_rao - alpha_fee_rao(gross_alpha_fill_rao)
+    cost_basis = ceil_div(
+        position_total_tao_spent_rao * gross_alpha_fill_rao, position_total_alpha_rao
+    )
+    required_proceeds = int(
+        (Decimal(cost_basis) * Decimal(str(pct_profit))).to_integral_value(
+            rounding=ROUND_CEILING
+        )
+    ) + int(flat_fee_sell_rao)
+    limit_price_rao = ceil_div(required_proceeds * RAO_PER_TAO, effective_alpha)
+    sl_mult = Decimal("1") - Decimal(str(slippage_sell_pct))
+    activation_price_rao = int(
+        (Decimal(limit_price_rao) / sl_mult).to_integral_value(rounding=ROUND_CEILING)
+    )
+    return activation_price_rao, limit_price_rao, cost_basis, required_proceeds
+
+
+def _dynamic(alpha_in_rao: int, tao_in_rao: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        alpha_in=SimpleNamespace(rao=alpha_in_rao),
+        tao_in=SimpleNamespace(rao=tao_in_rao),
+    )
+
+
+@pytest.mark.parametrize("net_limit_rao", [-1, 0, 1, 2, 999, 1000, 1999, 2000, 10**9])
+def test_max_gross_alpha_edges(net_limit_rao):
+    assert max_gross_alpha_for_net_limit(
+        net_limit_rao
+    ) == ref_max_gross_alpha_for_net_limit(net_limit_rao)
+
+
+def test_max_gross_alpha_matches_loop():
+    rng = random.Random(0)
+    for _ in range(20_000):
+        net_limit_rao = rng.randint(1, 10**16)
+        assert max_gross_alpha_for_net_limit(
+            net_limit_rao
+        ) == ref_max_gross_alpha_for_net_limit(net_limit_rao)
+
+
+def test_activation_and_limit_matches_decimal():
+    rng = random.Random(1)
+    for _ in range(20_000):
+        total_alpha = rng.randint(1_000, 10**14)
+        pct_profit_ppm = rng.randint(PPM_DEN + 1, 2 * PPM_DEN)
+        slippage_sell_ppm = rng.randint(0, PPM_DEN // 2)
+        kwargs = dict(
+            position_total_alpha_rao=total_alpha,
+            position_total_tao_spent_rao=rng.randint(1, 10**13),
+            gross_alpha_fill_rao=rng.randint(1_000, total_alpha),
+            flat_fee_sell_rao=rng.randint(0, 10**6),
+        )
+        assert compute_activation_and_limit_for_fill(
+            **kwargs,
+            pct_profit_ppm=pct_profit_ppm,
+            slippage_sell_ppm=slippage_sell_ppm,
+        ) == ref_activation_and_limit(
+            **kwargs,
+            pct_profit=pct_profit_ppm / PPM_DEN,
+            slippage_sell_pct=slippage_sell_ppm / PPM_DEN,
+        )
+
+
+def test_build_sell_plan_is_profitable_and_fresh():
+    rng = random.Random(2)
+    plans = 0
+    for _ in range(2_000):
+        total_alpha = rng.randint(10**9, 10**13)
+        kwargs = dict(
+            netuid=rng.randint(1, 128),
+            dynamic=_dynamic(rng.randint(10**12, 10**15), rng.randint(10**12, 10**15)),
+            position_total_alpha_rao=total_alpha,
+            position_total_tao_spent_rao=rng.randint(10**6, 10**12),
+            pct_profit_ppm=rng.randint(PPM_DEN + 1, 1_200_000),
+            slippage_sell_ppm=rng.randint(0, 50_000),
+            flat_fee_sell_rao=135_688,
+            max_sell_alpha_rao=rng.randint(1, total_alpha),
+        )
+        plan = build_sell_plan(**kwargs)
+        if plan is None:
+            continue
+        plans += 1
+
+        activation, limit, cost_basis, required = ref_activation_and_limit(
+            position_total_alpha_rao=total_alpha,
+            position_total_tao_spent_rao=kwargs["position_total_tao_spent_rao"],
+            gross_alpha_fill_rao=plan.amount_alpha_to_sell_rao,
+            pct_profit=kwargs["pct_profit_ppm"] / PPM_DEN,
+            slippage_sell_pct=kwargs["slippage_sell_ppm"] / PPM_DEN,
+            flat_fee_sell_rao=kwargs["flat_fee_sell_rao"],
+        )
+        assert plan.activation_price.rao == activation
+        assert plan.limit_price.rao == limit
+        assert plan.assumed_cost_basis_rao == cost_basis
+        assert plan.required_proceeds_rao == required
+        assert 0 < plan.amount_alpha_to_sell_rao <= kwargs["max_sell_alpha_rao"]
+        assert plan.amount_alpha_into_pool_rao == net_alpha_into_pool_rao(
+            plan.amount_alpha_to_sell_rao
+        )
+
+        # A cache hit must not hand back the Balance objects of an earlier plan
+        again = build_sell_plan(**kwargs)
+        assert again == plan
+        assert again.limit_price is not plan.limit_price
+        assert again.activation_price is not plan.activation_price
+    assert plans > 0
+
+
+def test_build_sell_plan_empty_position():
+    _build_sell_plan_for_reserves.cache_clear()
+    assert (
+        build_sell_plan(
+            netuid=1,
+            dynamic=_dynamic(10**12, 10**12),
+            position_total_alpha_rao=0,
+            position_total_tao_spent_rao=0,
+            pct_profit_ppm=1_100_000,
+            slippage_sell_ppm=10_000,
+            flat_fee_sell_rao=0,
+        )
+        is None
+    )
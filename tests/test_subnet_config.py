@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("bittensor")
+
+from scalpel import subnet_config  # noqa: E402
+from scalpel.subnet_config import (  # noqa: E402
+    _REQUIRED_SUBNET_FIELDS,
+    _SUBNET_FIELD_TYPES,
+    _check_subnet_record,
+    get_subnet_configs,
+    invalidate_subnet_configs,
+)
+
+RECORD = {
+    "netuid": 3,
+    "limit_price_buy": 0.01,
+    "activation_price_buy": 0.009,
+    "pct_profit": 1.1,
+    "slippage_sell_pct": 0.01,
+}
+
+
+def test_field_tables_follow_the_dataclass():
+    assert _REQUIRED_SUBNET_FIELDS == tuple(RECORD)
+    assert "max_alpha_position" in _SUBNET_FIELD_TYPES
+    # Derived in __post_init__, never read from the file
+    assert "pct_profit_ppm" not in _SUBNET_FIELD_TYPES
+
+
+def test_valid_record_passes():
+    _check_subnet_record(0, {**RECORD, "sell_pct": 1, "validator_hotkey": "5Hot"})
+
+
+def test_missing_required_field():
+    record = {k: v for k, v in RECORD.items() if k != "pct_profit"}
+    with pytest.raises(
+        ValueError, match=r"entry \[2\]: missing required field 'pct_profit'"
+    ):
+        _check_subnet_record(2, record)
+
+
+@pytest.mark.parametrize("name", ["foo", "pct_profit_ppm"])
+def test_unknown_field(name):
+    with pytest.raises(ValueError, match=f"unknown field '{name}'"):
+        _check_subnet_record(0, {**RECORD, name: 1})
+
+
+@pytest.mark.parametrize("name", ["netuid", "limit_price_buy", "sell_pct"])
+def test_bool_rejected_where_number_expected(name):
+    with pytest.raises(ValueError, match=f"field '{name}' must be .*, got bool"):
+        _check_subnet_record(0, {**RECORD, name: True})
+
+
+@pytest.mark.parametrize(
+    "name, value", [("netuid", 3.0), ("pct_profit", "1.1"), ("validator_hotkey", 5)]
+)
+def test_wrong_type_rejected(name, value):
+    with pytest.raises(ValueError, match=f"field '{name}'"):
+        _check_subnet_record(0, {**RECORD, name: value})
+
+
+@pytest.mark.parametrize(
+    "name", ["validator_hotkey", "amount_tao_to_stake_buy", "max_alpha_position"]
+)
+def test_null_allowed_for_optional_fields(name):
+    _check_subnet_record(0, {**RECORD, name: None})
+
+
+def test_null_rejected_for_required_fields():
+    with pytest.raises(ValueError, match="field 'limit_price_buy'"):
+        _check_subnet_record(0, {**RECORD, "limit_price_buy": None})
+
+
+@pytest.mark.parametrize("content", ['{"netuid": 1}', "[1, 2]"])
+def test_non_list_of_objects_top_level(tmp_path, monkeypatch, content):
+    path = tmp_path / "subnets_config.json"
+    path.write_text(content)
+    monkeypatch.setattr(subnet_config, "CONFIG_PATH", path)
+    invalidate_subnet_configs()
+    try:
+        with pytest.raises(
+            ValueError, match="expected a JSON array of subnet objects"
+        ):
+            get_subnet_configs()
+    finally:
+        invalidate_subnet_configs()